@@ -0,0 +1,39 @@
+"""Per-capture work for `ctmux watch`.
+
+This module has no click/libtmux imports and is fully annotated so it can
+be compiled with mypyc (see "Development" in the README); otherwise it is
+imported as plain Python.
+"""
+
+
+def watch_tick(last_lines: list[bytes] | None, lines: list[bytes],
+               elapsed: float, cursor: bytes) -> tuple[bytes, bytes] | None:
+    """Compare a capture to the previous one.
+
+    Returns None if nothing changed, otherwise the block to print and the
+    changed lines it contains (for --until matching). If the capture got
+    shorter, the header says how many lines were removed.
+    """
+    common = 0
+    if last_lines is not None:
+        if lines == last_lines:
+            return None
+        # Lines before the first difference are not printed again
+        for old, new in zip(last_lines, lines):
+            if old != new:
+                break
+            common += 1
+
+    header = f"--- [{elapsed:.1f}s]"
+    if common:
+        header += f" from line {common + 1}"
+    # Trailing rows that disappeared would otherwise be invisible
+    removed = len(last_lines) - len(lines) if last_lines is not None else 0
+    if removed > 0:
+        header += f" ({removed} line{'s' if removed != 1 else ''} removed)"
+    header += " ---\n"
+
+    changed = b"\n".join(lines[common:])
+    body = changed + b"\n" if common < len(lines) else b""
+    block = b"".join([header.encode(), body, b"[cursor: ", cursor, b"]\n"])
+    return block, changed
@@ -1,8 +1,12 @@
 """Main CLI for claudetmux."""
 
+import functools
 import hashlib
 import json
+import os
 import re
+import shlex
+import subprocess
 import sys
 import tempfile
 from pathlib import Path
@@ -10,6 +14,19 @@ from pathlib import Path
 import click
 import libtmux
 
+from claudetmux._watch_inner import watch_tick
+from claudetmux.control import ControlClient, ControlError
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+try:
+    from blake3 import blake3
+except ImportError:  # optional speedup, see the "fast" extra
+    blake3 = None
+
 
 # ANSI escape code pattern
 ANSI_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
@@ -132,30 +149,55 @@ def transform_tags_style(content: str) -> str:
     return ''.join(result)
 
 
-# Store last screen hash to detect changes (persisted to temp file)
+def json_dumps(obj) -> bytes:
+    """Encode indented JSON to bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    # Match orjson's output: UTF-8 rather than \u escapes
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode()
 
-HASH_FILE = Path(tempfile.gettempdir()) / "ctmux_screen_hashes.json"
 
+# Screen hashes are raw digests of this many bytes
+DIGEST_SIZE = 16
 
-def load_screen_hashes() -> dict[str, str]:
-    """Load screen hashes from temp file."""
-    if HASH_FILE.exists():
-        try:
-            return json.loads(HASH_FILE.read_text())
-        except Exception:
-            return {}
-    return {}
 
+def screen_digest(data: bytes) -> bytes:
+    """Hash captured screen bytes for change detection."""
+    if blake3 is not None:
+        return blake3(data).digest(length=DIGEST_SIZE)
+    return hashlib.sha256(data).digest()[:DIGEST_SIZE]
+
+
+# Store last screen hash to detect changes (persisted to temp files, one per
+# pane, so checking one pane never reads or rewrites the others)
+
+HASH_DIR = Path(tempfile.gettempdir())
 
-def save_screen_hash(key: str, hash_val: str):
-    """Save a screen hash to temp file."""
-    hashes = load_screen_hashes()
-    hashes[key] = hash_val
-    HASH_FILE.write_text(json.dumps(hashes))
 
+def screen_hash_path(key: str) -> Path:
+    """Get the temp file holding the screen hash for a pane key."""
+    name = hashlib.sha1(key.encode()).hexdigest()
+    return HASH_DIR / f"ctmux_{name}.hash"
 
+
+def load_screen_hash(path: Path) -> bytes | None:
+    """Load a pane's last screen hash from its temp file."""
+    try:
+        hash_val = path.read_bytes()
+    except OSError:
+        return None
+    # Anything else is a partial write or an older format
+    return hash_val if len(hash_val) == DIGEST_SIZE else None
+
+
+def save_screen_hash(path: Path, hash_val: bytes):
+    """Save a pane's screen hash to its temp file."""
+    path.write_bytes(hash_val)
+
+
+@functools.cache
 def get_server() -> libtmux.Server:
-    """Get the tmux server connection."""
+    """Get the tmux server connection (shared by every command in a process)."""
     try:
         return libtmux.Server()
     except Exception as e:
@@ -175,10 +217,15 @@ def find_session(server: libtmux.Server, name: str) -> libtmux.Session:
 def find_pane(session: libtmux.Session, pane_id: str | None = None) -> libtmux.Pane:
     """Find a pane in session. Returns active pane if no ID specified."""
     if pane_id:
-        for window in session.windows:
-            for pane in window.panes:
-                if pane.pane_id == pane_id or str(pane.pane_index) == pane_id:
-                    return pane
+        # One `list-panes -s` for the whole session instead of one per window.
+        # Pane IDs always start with '%', anything else is an index (first
+        # match in window order), so only one field needs checking
+        if pane_id.startswith("%"):
+            matches = session.panes.filter(pane_id=pane_id)
+        else:
+            matches = session.panes.filter(pane_index=pane_id)
+        if matches:
+            return matches[0]
         click.echo(f"Pane '{pane_id}' not found", err=True)
         sys.exit(1)
     # Return active pane
@@ -191,12 +238,100 @@ def find_pane(session: libtmux.Session, pane_id: str | None = None) -> libtmux.P
     sys.exit(1)
 
 
+def capture_bytes(pane: libtmux.Pane, start: int | str, end: int | str,
+                  escape_sequences: bool = False) -> bytes:
+    """Capture pane contents as raw bytes, without decoding or splitting lines."""
+    cmd = ["tmux", "capture-pane", "-p", "-t", pane.pane_id, "-S", str(start), "-E", str(end)]
+    if escape_sequences:
+        cmd.append("-e")
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        click.echo(f"Error capturing pane: {result.stderr.decode(errors='replace').strip()}", err=True)
+        sys.exit(1)
+    # Drop trailing blank rows of the viewport
+    return result.stdout.rstrip(b"\n")
+
+
+def hex_keys(data: bytes) -> list[str]:
+    """Build `send-keys -H` arguments, which tmux passes through unparsed."""
+    return [f"{b:02x}" for b in data]
+
+
+def send_text(pane: libtmux.Pane, text: str):
+    """Type text into a pane exactly as given.
+
+    Sent as hex keys: as a literal argument, tmux would parse text starting
+    with '-' as an option or ending in ';' as a command separator.
+    """
+    data = text.encode()
+    # Bounded so a long paste doesn't exceed the argument list limit
+    for i in range(0, len(data), 4096):
+        pane.cmd("send-keys", "-H", *hex_keys(data[i:i + 4096]))
+
+
+def mouse_sequences(button: int, x: int, y: int) -> tuple[bytes, bytes]:
+    """Build the mouse press and release escape sequences for a cell."""
+    # Format: ESC [ M Cb Cx Cy (where Cb = button+32, Cx/Cy = position+33)
+    # Release is reported as button 3
+    pos = bytes([x + 33, y + 33])
+    return b"\x1b[M" + bytes([button + 32]) + pos, b"\x1b[M" + bytes([3 + 32]) + pos
+
+
+def write_fd(fd: int, data: bytes):
+    """Write all of data to a file descriptor, bypassing Python's buffering."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def in_repl() -> bool:
+    """Whether the current command is being run by `ctmux repl`."""
+    obj = click.get_current_context().obj
+    return bool(obj and obj.get("repl"))
+
+
 @click.group()
 def main():
     """Claude tmux interface - interact with tmux sessions."""
     pass
 
 
+@main.command("repl")
+def repl():
+    """Run ctmux commands read from stdin, one per line.
+
+    All commands share one process and tmux server connection, which is
+    cheaper than launching ctmux per command from a script:
+
+      printf 'send work C-c\\ncapture work --if-changed\\n' | ctmux repl
+
+    Since stdin holds the commands, nothing can prompt for an answer:
+    commands that would (kill without --force) fail instead.
+    """
+    for line in sys.stdin:
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            continue
+        if not args:
+            continue
+        if args[0] == "repl":
+            click.echo("Error: already in repl", err=True)
+            continue
+
+        try:
+            main.main(args, prog_name="ctmux", standalone_mode=False, obj={"repl": True})
+        except click.ClickException as e:
+            e.show()
+        except click.Abort:
+            click.echo("Aborted!", err=True)
+        except SystemExit:
+            # Commands report their own errors before exiting
+            pass
+        sys.stdout.flush()
+
+
 # --- Session Management ---
 
 
@@ -206,17 +341,19 @@ def list_sessions(as_json: bool):
     """List all tmux sessions."""
     server = get_server()
     sessions = []
+    # Counts come from the list-sessions/list-windows formats already
+    # fetched, rather than listing each session's windows again
     for s in server.sessions:
         info = {
             "name": s.session_name,
             "id": s.session_id,
-            "windows": len(s.windows),
+            "windows": int(s.session_windows),
             "attached": s.session_attached == "1",
         }
         sessions.append(info)
 
     if as_json:
-        click.echo(json.dumps(sessions, indent=2))
+        click.echo(json_dumps(sessions))
     else:
         if not sessions:
             click.echo("No tmux sessions found")
@@ -239,13 +376,13 @@ def list_windows(session: str, as_json: bool):
             "name": w.window_name,
             "id": w.window_id,
             "index": w.window_index,
-            "panes": len(w.panes),
-            "active": w == sess.active_window,
+            "panes": int(w.window_panes),
+            "active": w.window_active == "1",
         }
         windows.append(info)
 
     if as_json:
-        click.echo(json.dumps(windows, indent=2))
+        click.echo(json_dumps(windows))
     else:
         for w in windows:
             active = "*" if w["active"] else ""
@@ -277,12 +414,12 @@ def list_panes(session: str, window: str | None, as_json: bool):
                 "window_index": w.window_index,
                 "width": p.pane_width,
                 "height": p.pane_height,
-                "active": p == w.active_pane,
+                "active": p.pane_active == "1",
             }
             panes.append(info)
 
     if as_json:
-        click.echo(json.dumps(panes, indent=2))
+        click.echo(json_dumps(panes))
     else:
         for p in panes:
             active = "*" if p["active"] else ""
@@ -323,40 +460,39 @@ def capture_pane(session: str, pane: str | None, lines: int, if_changed: bool,
 
     # Capture visible viewport only (default) or with history
     if history:
-        content = p.capture_pane(start=f"-{lines}", end="-0", escape_sequences=need_ansi)
+        data = capture_bytes(p, start=f"-{lines}", end="-0", escape_sequences=need_ansi)
     else:
         # Visible viewport only - no scrollback
-        content = p.capture_pane(start=0, end="-", escape_sequences=need_ansi)
-
-    if isinstance(content, list):
-        content = "\n".join(content)
+        data = capture_bytes(p, start=0, end="-", escape_sequences=need_ansi)
 
     # Check if changed (use raw content for hash to detect style changes too)
     if if_changed:
-        content_hash = hashlib.md5(content.encode()).hexdigest()
-        pane_key = f"{session}:{p.pane_id}"
-        hashes = load_screen_hashes()
-        if hashes.get(pane_key) == content_hash:
+        content_hash = screen_digest(data)
+        hash_path = screen_hash_path(f"{session}:{p.pane_id}")
+        if load_screen_hash(hash_path) == content_hash:
             click.echo("[no change]")
             return
-        save_screen_hash(pane_key, content_hash)
+        save_screen_hash(hash_path, content_hash)
 
-    # Transform based on style mode
+    # Transform based on style mode; plain and ansi output is written as the
+    # bytes tmux gave us, only decoding when a transform needs text
     if style == "lines":
-        content = transform_lines_style(content)
+        click.echo(transform_lines_style(data.decode(errors="replace")))
     elif style == "tags":
-        content = transform_tags_style(content)
-    elif style == "none":
-        content = strip_ansi(content) if need_ansi else content
-    # style == "ansi" keeps content as-is with escape codes
-
-    click.echo(content)
+        click.echo(transform_tags_style(data.decode(errors="replace")))
+    else:
+        # style == "none" was captured without escapes; "ansi" keeps them as-is
+        click.echo(data)
 
     # Append cursor metadata unless --raw
     if not raw:
         click.echo(f"[cursor: {p.cursor_x},{p.cursor_y}]")
 
 
+# How long a pane must be quiet after output before watch captures it
+WATCH_SETTLE = 0.02
+
+
 @main.command("watch")
 @click.argument("session")
 @click.option("--pane", "-p", help="Pane ID or index")
@@ -364,39 +500,99 @@ def capture_pane(session: str, pane: str | None, lines: int, if_changed: bool,
 @click.option("--timeout", "-t", default=30.0, help="Max time to watch")
 @click.option("--until", "-u", help="Stop when this text appears")
 def watch_pane(session: str, pane: str | None, interval: float, timeout: float, until: str | None):
-    """Watch pane for changes, outputting only when content changes."""
+    """Watch pane for changes, outputting only the lines that changed.
+
+    The first capture is printed in full. After that, each change prints
+    the lines from the first one that differs ("from line N", 1-based)
+    to the bottom of the screen; "(N lines removed)" marks a capture that
+    got shorter.
+
+    The pane is captured whenever tmux reports output to it, once the output
+    has been quiet for a moment (a continuous stream is still captured at
+    least every --interval). Without control mode, falls back to polling
+    every --interval.
+
+    Control mode attaches a read-only client to the session while watching,
+    so the session shows as attached and client-attached/client-detached
+    hooks run. With the focus-events option on, attaching would send focus
+    events to the watched app, so watch polls instead.
+    """
     import time
 
     server = get_server()
     sess = find_session(server, session)
     p = find_pane(sess, pane)
 
-    last_hash = ""
+    # Reuse one control-mode client for every capture instead of spawning
+    # `tmux capture-pane` each time; fall back to polling if unavailable, or
+    # if attaching would send focus events (i.e. input) to the pane.
+    control = None
+    if p.cmd("display-message", "-p", "#{focus-events}").stdout != ["1"]:
+        control = ControlClient.open(sess.session_id)
+    capture_cmds = [
+        f"capture-pane -p -t {p.pane_id}",
+        f"display-message -p -t {p.pane_id} '#{{cursor_x}},#{{cursor_y}}'",
+    ]
+
+    # Within one process the previous capture can be kept and compared
+    # line by line, so nothing is hashed and only the changed tail is
+    # printed. Everything stays bytes; nothing is decoded just to be
+    # re-encoded.
+    last_lines: list[bytes] | None = None
+    until_bytes = until.encode() if until else None
     start_time = time.time()
 
-    while True:
-        elapsed = time.time() - start_time
-        if elapsed >= timeout:
-            click.echo(f"[timeout after {timeout}s]", err=True)
-            break
-
-        content = p.capture_pane(start=0, end="-")  # Visible viewport only
-        if isinstance(content, list):
-            content = "\n".join(content)
-
-        content_hash = hashlib.md5(content.encode()).hexdigest()
+    # Change blocks are written straight to the fd as one bytes blob
+    sys.stdout.flush()
+    stdout_fd = sys.stdout.fileno()
 
-        if content_hash != last_hash:
-            click.echo(f"--- [{elapsed:.1f}s] ---")
-            click.echo(content)
-            click.echo(f"[cursor: {p.cursor_x},{p.cursor_y}]")
-            last_hash = content_hash
-
-            if until and until in content:
-                click.echo(f"[found '{until}']", err=True)
+    try:
+        while True:
+            elapsed = time.time() - start_time
+            if elapsed >= timeout:
+                click.echo(f"[timeout after {timeout}s]", err=True)
                 break
 
-        time.sleep(interval)
+            if control is not None:
+                if last_lines is not None:
+                    # Sleep until tmux reports output to the pane, waking at
+                    # least every interval to recheck the timeout
+                    if not control.wait_output(p.pane_id, min(interval, timeout - elapsed)):
+                        continue
+                    settle_deadline = time.time() + interval
+                    while (time.time() < settle_deadline
+                           and control.wait_output(p.pane_id, WATCH_SETTLE)):
+                        pass
+                    elapsed = time.time() - start_time
+
+                lines, cursor_lines = control.commands(capture_cmds)
+                while lines and not lines[-1]:
+                    lines.pop()
+                cursor = b"".join(cursor_lines)
+            else:
+                # Visible viewport only
+                lines = capture_bytes(p, start=0, end="-").split(b"\n")
+                cursor = f"{p.cursor_x},{p.cursor_y}".encode()
+
+            tick = watch_tick(last_lines, lines, elapsed, cursor)
+            if tick is not None:
+                block, changed = tick
+                write_fd(stdout_fd, block)
+                last_lines = lines
+
+                # Unchanged lines were already searched on an earlier pass
+                if until_bytes and until_bytes in changed:
+                    click.echo(f"[found '{until}']", err=True)
+                    break
+
+            if control is None:
+                time.sleep(interval)
+    except ControlError as e:
+        click.echo(f"Error watching pane: {e}", err=True)
+        sys.exit(1)
+    finally:
+        if control is not None:
+            control.close()
 
 
 # --- Input ---
@@ -440,14 +636,18 @@ def type_text(session: str, text: str, pane: str | None, enter: bool, delay: int
     p = find_pane(sess, pane)
 
     if delay > 0:
-        for char in text:
-            p.send_keys(char, literal=True)
-            time.sleep(delay / 1000)
+        # Send ~20ms worth of characters per tmux call rather than one
+        # call per character, sleeping once per chunk to keep the rate
+        chunk_size = max(1, int(20 / delay))
+        for i in range(0, len(text), chunk_size):
+            chunk = text[i:i + chunk_size]
+            send_text(p, chunk)
+            time.sleep(len(chunk) * delay / 1000)
     else:
-        p.send_keys(text, literal=True)
+        send_text(p, text)
 
     if enter:
-        p.send_keys("Enter")
+        p.send_keys("Enter", enter=False)
 
     click.echo(f"Typed: {text!r}" + (" + Enter" if enter else ""))
 
@@ -470,22 +670,21 @@ def mouse_click(session: str, x: int, y: int, pane: str | None, click_type: str,
     button_map = {"left": 0, "middle": 1, "right": 2}
     button = button_map[click_type]
 
-    # Send mouse down then up (basic click)
-    # Format: ESC [ M Cb Cx Cy (where Cb = button+32, Cx/Cy = position+33)
-    cb = chr(button + 32)
-    cx = chr(x + 33)
-    cy = chr(y + 33)
+    if not (0 <= x <= 222 and 0 <= y <= 222):
+        click.echo("Mouse coordinates must be between 0 and 222", err=True)
+        sys.exit(1)
 
-    # Mouse press
-    p.send_keys(f"\x1b[M{cb}{cx}{cy}", literal=True)
-    # Mouse release (button 3 = release)
-    p.send_keys(f"\x1b[M{chr(3 + 32)}{cx}{cy}", literal=True)
+    # Send mouse down then up (basic click). send-keys -H passes the bytes
+    # through untouched in one tmux call; literal keys would UTF-8 encode
+    # coordinates above 94
+    down, up = mouse_sequences(button, x, y)
+    keys = hex_keys(down + up)
+    p.cmd("send-keys", "-H", *keys)
 
     if double:
         import time
         time.sleep(0.05)
-        p.send_keys(f"\x1b[M{cb}{cx}{cy}", literal=True)
-        p.send_keys(f"\x1b[M{chr(3 + 32)}{cx}{cy}", literal=True)
+        p.cmd("send-keys", "-H", *keys)
 
     click.echo(f"Clicked {click_type} at ({x}, {y})" + (" x2" if double else ""))
 
@@ -530,6 +729,10 @@ def new_session(name: str, window: str, cmd: str | None, width: int, height: int
 @click.option("--force", "-f", is_flag=True, help="Kill without confirmation")
 def kill_session(session: str, force: bool):
     """Kill a tmux session."""
+    # A confirmation prompt in repl would consume the next command lines
+    if not force and in_repl():
+        raise click.UsageError("kill needs --force in repl")
+
     server = get_server()
     sess = find_session(server, session)
 
@@ -0,0 +1,143 @@
+"""Persistent tmux control-mode connection for long-running commands."""
+
+import os
+import selectors
+import subprocess
+import time
+
+
+class ControlError(Exception):
+    """A control-mode command failed or the connection was lost."""
+
+
+class ControlClient:
+    """A `tmux -C` client attached to one session.
+
+    Commands are written to the client's stdin and their output is read back
+    from the %begin/%end framed reply, so repeated commands (e.g. one capture
+    per poll in `ctmux watch`) don't fork a new tmux process each time.
+
+    tmux also sends a `%output %<pane> ...` notification whenever a pane in
+    the session receives bytes; these are recorded so callers can sleep
+    until a pane actually changes instead of polling it.
+    """
+
+    def __init__(self, proc: subprocess.Popen):
+        self.proc = proc
+        self._fd = proc.stdout.fileno()
+        self._buf = bytearray()
+        self._dirty: set[str] = set()
+        # Registered once; waits sleep in the kernel (epoll/kqueue)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._fd, selectors.EVENT_READ)
+
+    @classmethod
+    def open(cls, session: str) -> "ControlClient | None":
+        """Attach to a session. Returns None if control mode is unavailable.
+
+        The client is a real (read-only) attached client for as long as it is
+        open: the session reports itself as attached, client-attached and
+        client-detached hooks run, and panes with focus reporting enabled
+        receive focus events.
+        """
+        try:
+            proc = subprocess.Popen(
+                # Watch only: never resize windows or accept input from us
+                ["tmux", "-C", "attach-session", "-f", "read-only,ignore-size", "-t", session],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return None
+
+        client = cls(proc)
+        try:
+            # tmux answers the attach itself with an (empty) reply block
+            client._read_reply()
+        except ControlError:
+            client.close()
+            return None
+        return client
+
+    def command(self, cmd: str) -> list[bytes]:
+        """Run one tmux command and return its output lines."""
+        return self.commands([cmd])[0]
+
+    def commands(self, cmds: list[str]) -> list[list[bytes]]:
+        """Run several tmux commands in one write, returning each one's output."""
+        try:
+            self.proc.stdin.write("".join(f"{cmd}\n" for cmd in cmds).encode())
+            self.proc.stdin.flush()
+        except OSError as e:
+            raise ControlError(f"control client closed: {e}") from e
+        return [self._read_reply() for _ in cmds]
+
+    def wait_output(self, pane_id: str, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for output to `pane_id`.
+
+        Returns True (and clears the pending flag) if the pane received
+        output since the last call, False on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while pane_id not in self._dirty:
+            line = self._readline(deadline - time.monotonic())
+            if line is None:
+                return False
+            self._notify(line)
+        self._dirty.discard(pane_id)
+        return True
+
+    def _read_reply(self) -> list[bytes]:
+        """Read the next %begin ... %end block, recording notifications."""
+        tag = None
+        lines = []
+        while True:
+            line = self._readline()
+
+            if tag is None:
+                # Outside a block everything is a %notification
+                if line.startswith(b"%begin "):
+                    tag = line[len(b"%begin "):]
+                else:
+                    self._notify(line)
+                continue
+
+            # The closing guard repeats the time/number/flags of %begin
+            if line == b"%end " + tag:
+                return lines
+            if line == b"%error " + tag:
+                raise ControlError(b"\n".join(lines).decode(errors="replace"))
+            lines.append(line)
+
+    def _notify(self, line: bytes):
+        """Handle a notification line received outside a reply block."""
+        if line.startswith((b"%output ", b"%extended-output ")):
+            self._dirty.add(line.split(b" ", 2)[1].decode())
+        elif line.startswith(b"%exit"):
+            raise ControlError("control client detached")
+
+    def _readline(self, timeout: float | None = None) -> bytes | None:
+        """Read one line from tmux. Returns None if `timeout` expires first."""
+        while (end := self._buf.find(b"\n")) == -1:
+            if timeout is not None:
+                if not self._selector.select(max(timeout, 0)):
+                    return None
+            chunk = os.read(self._fd, 65536)
+            if not chunk:
+                raise ControlError("control client exited")
+            self._buf += chunk
+        line = bytes(self._buf[:end])
+        del self._buf[:end + 1]
+        return line
+
+    def close(self):
+        """Detach the control client."""
+        self._selector.close()
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
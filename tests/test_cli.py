@@ -0,0 +1,52 @@
+"""Tests for the ctmux CLI."""
+
+import pytest
+from click.testing import CliRunner
+
+from claudetmux.cli import main, send_text
+
+
+def test_repl_kill_without_force_does_not_prompt():
+    # A prompt would read the following lines as answers; the repl line
+    # after kill must still run as a command
+    result = CliRunner().invoke(main, ["repl"], input="kill work\nrepl\n")
+
+    assert "kill needs --force in repl" in result.output
+    assert "already in repl" in result.output
+    assert "Kill session" not in result.output
+
+
+class FakePane:
+    def __init__(self):
+        self.calls = []
+
+    def cmd(self, *args):
+        self.calls.append(args)
+
+
+def test_send_text_sends_hex_keys_without_enter():
+    # As literal arguments tmux would drop a trailing ';' or read '-x' as
+    # an option; hex keys arrive unparsed
+    pane = FakePane()
+    send_text(pane, "-x;é")
+
+    assert pane.calls == [("send-keys", "-H", "2d", "78", "3b", "c3", "a9")]
+
+
+def test_send_text_splits_long_text():
+    pane = FakePane()
+    send_text(pane, "z" * 5000)
+
+    assert [len(c) - 2 for c in pane.calls] == [4096, 904]
+
+
+def test_json_dumps_fallback_matches_orjson(monkeypatch):
+    import claudetmux.cli as cli
+
+    obj = [{"name": "café", "windows": 2}]
+    monkeypatch.setattr(cli, "orjson", None)
+    fallback = cli.json_dumps(obj)
+
+    assert fallback == '[\n  {\n    "name": "café",\n    "windows": 2\n  }\n]'.encode()
+    orjson = pytest.importorskip("orjson")
+    assert fallback == orjson.dumps(obj, option=orjson.OPT_INDENT_2)
@@ -0,0 +1,115 @@
+"""Tests for the tmux control-mode client, fed scripted protocol bytes."""
+
+import io
+import os
+
+import pytest
+
+from claudetmux.control import ControlClient, ControlError
+
+
+class FakeProc:
+    """Stands in for the `tmux -C` process: stdout is a pipe we write to."""
+
+    def __init__(self):
+        read_fd, self.feed_fd = os.pipe()
+        self.stdout = os.fdopen(read_fd, "rb", buffering=0)
+        self.stdin = io.BytesIO()
+
+    def feed(self, data: bytes):
+        os.write(self.feed_fd, data)
+
+    def poll(self):
+        return 0
+
+
+@pytest.fixture
+def proc():
+    proc = FakeProc()
+    yield proc
+    proc.stdout.close()
+    try:
+        os.close(proc.feed_fd)
+    except OSError:
+        pass
+
+
+@pytest.fixture
+def client(proc):
+    client = ControlClient(proc)
+    yield client
+    client.close()
+
+
+def test_command_returns_reply_lines(proc, client):
+    proc.feed(b"%begin 1 10 1\nline one\n\nline three\n%end 1 10 1\n")
+
+    assert client.command("capture-pane -p") == [b"line one", b"", b"line three"]
+    assert proc.stdin.getvalue() == b"capture-pane -p\n"
+
+
+def test_commands_read_one_reply_each(proc, client):
+    proc.feed(b"%begin 1 1 1\na\n%end 1 1 1\n%begin 1 2 1\nb\n%end 1 2 1\n")
+
+    assert client.commands(["one", "two"]) == [[b"a"], [b"b"]]
+    assert proc.stdin.getvalue() == b"one\ntwo\n"
+
+
+def test_end_guard_must_match_begin(proc, client):
+    # A content line that looks like %end for another command is kept
+    proc.feed(b"%begin 1 5 1\n%end 1 4 1\n%end 1 5 1\n")
+
+    assert client.command("x") == [b"%end 1 4 1"]
+
+
+def test_error_reply_raises(proc, client):
+    proc.feed(b"%begin 1 7 1\ncan't find pane: %9\n%error 1 7 1\n")
+
+    with pytest.raises(ControlError, match="can't find pane: %9"):
+        client.command("capture-pane -t %9")
+
+
+def test_notifications_before_begin_are_recorded(proc, client):
+    proc.feed(b"%session-changed $1 work\n%output %3 hi\\015\\012\n"
+              b"%begin 1 2 1\nok\n%end 1 2 1\n")
+
+    assert client.command("x") == [b"ok"]
+    assert client.wait_output("%3", 0)
+    assert not client.wait_output("%1", 0)
+
+
+def test_wait_output_tracks_panes(proc, client):
+    proc.feed(b"%output %1 a\n%extended-output %2 0 : b\n")
+
+    assert client.wait_output("%2", 1)
+    assert client.wait_output("%1", 1)
+    # The pending flag is cleared once reported
+    assert not client.wait_output("%1", 0.01)
+
+
+def test_wait_output_times_out(proc, client):
+    proc.feed(b"%output %2 other pane\n")
+
+    assert not client.wait_output("%1", 0.05)
+
+
+def test_line_split_across_reads(proc, client):
+    proc.feed(b"%output %1 par")
+    assert not client.wait_output("%1", 0.05)
+
+    proc.feed(b"tial\n")
+    assert client.wait_output("%1", 1)
+
+
+def test_exit_notification_raises(proc, client):
+    proc.feed(b"%exit\n")
+
+    with pytest.raises(ControlError, match="detached"):
+        client.wait_output("%1", 1)
+
+
+def test_eof_raises(proc, client):
+    os.close(proc.feed_fd)
+
+    with pytest.raises(ControlError, match="exited"):
+        client.command("x")
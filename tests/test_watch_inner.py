@@ -0,0 +1,64 @@
+"""Tests for watch's per-capture diffing."""
+
+from claudetmux._watch_inner import watch_tick
+
+
+def test_first_capture_prints_everything():
+    tick = watch_tick(None, [b"a", b"b"], 0.0, b"1,2")
+
+    assert tick == (b"--- [0.0s] ---\na\nb\n[cursor: 1,2]\n", b"a\nb")
+
+
+def test_unchanged_capture_prints_nothing():
+    assert watch_tick([b"a", b"b"], [b"a", b"b"], 1.0, b"1,2") is None
+
+
+def test_changed_tail_prints_from_first_difference():
+    block, changed = watch_tick([b"a", b"b", b"c"], [b"a", b"x", b"y"], 1.5, b"0,2")
+
+    assert block == b"--- [1.5s] from line 2 ---\nx\ny\n[cursor: 0,2]\n"
+    assert changed == b"x\ny"
+
+
+def test_changed_first_line_prints_everything():
+    block, changed = watch_tick([b"a", b"b"], [b"z", b"b"], 1.0, b"0,0")
+
+    assert block == b"--- [1.0s] ---\nz\nb\n[cursor: 0,0]\n"
+    assert changed == b"z\nb"
+
+
+def test_appended_lines_print_only_new_ones():
+    block, changed = watch_tick([b"a"], [b"a", b"b", b"c"], 2.0, b"0,2")
+
+    assert block == b"--- [2.0s] from line 2 ---\nb\nc\n[cursor: 0,2]\n"
+    assert changed == b"b\nc"
+
+
+def test_shrunk_capture_reports_removed_lines():
+    block, changed = watch_tick([b"a", b"b", b"c"], [b"a"], 3.0, b"1,0")
+
+    assert block == b"--- [3.0s] from line 2 (2 lines removed) ---\n[cursor: 1,0]\n"
+    assert changed == b""
+
+
+def test_shrunk_and_changed_capture():
+    block, changed = watch_tick([b"a", b"b", b"c"], [b"a", b"x"], 3.0, b"1,1")
+
+    assert block == b"--- [3.0s] from line 2 (1 line removed) ---\nx\n[cursor: 1,1]\n"
+    assert changed == b"x"
+
+
+def test_cleared_screen():
+    block, changed = watch_tick([b"a", b"b"], [], 4.0, b"0,0")
+
+    assert block == b"--- [4.0s] (2 lines removed) ---\n[cursor: 0,0]\n"
+    assert changed == b""
+
+
+def test_changed_excludes_unchanged_prefix_for_until():
+    # --until matches against `changed`, so text only in the unchanged
+    # prefix must not be in it
+    _, changed = watch_tick([b"ready", b"x"], [b"ready", b"y"], 1.0, b"0,1")
+
+    assert b"ready" not in changed
+    assert changed == b"y"